@@ -26,7 +26,8 @@ class NamedFrozenSet(frozenset[A], Generic[A]):
 class NamedFrozenDict(dict[A, B], Generic[A, B]):
     """Hashable and immutable named mapping."""
     
-    __slots__ = ()
+    # Hash is cached like for frozensets, since the mapping is immutable
+    __slots__ = ('_hash',)
     
     def __repr__(self) -> str:
         
@@ -36,7 +37,11 @@ class NamedFrozenDict(dict[A, B], Generic[A, B]):
     
     def __hash__(self) -> int: # type: ignore
         
-        return hash(frozenset(self.items()))
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash: int = hash(frozenset(self.items()))
+            return self._hash
     
     def __setitem__(self, *args, **kwargs): # type: ignore
         
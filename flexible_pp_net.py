@@ -1,9 +1,18 @@
+import importlib.util
+
 import pandas as pd
 import pandapower as pp
 
-from .pandapower import infer_topology, apply_topology
+from .pandapower import infer_topology, apply_topology, position_map
 from .topology_search import topology_generator
 
+# Store element names with pyarrow if available, which vectorizes string
+# operations such as adding letter designations to bus names
+if importlib.util.find_spec('pyarrow') is not None:
+    _name_dtype = pd.StringDtype('pyarrow')
+else:
+    _name_dtype = pd.StringDtype()
+
 __all__ = ['FlexibleNet']
 
 class FlexibleNet(pp.auxiliary.pandapowerNet):
@@ -37,7 +46,7 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
         
         # Construct instance by copying or overwriting Pandapower network
         if copy:
-            net = pp_net.deepcopy()
+            net = _copy_pp_net(pp_net, cls._supported_elements)
         else:
             net = pp_net
         net._setattr('__class__', cls)
@@ -47,7 +56,7 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
             element_df = getattr(net, element)
             if set_name_to_idx:
                 element_df['name'] = element_df.index
-            element_df = element_df.astype({'name': pd.StringDtype()},
+            element_df = element_df.astype({'name': _name_dtype},
                                            copy=False)
             setattr(net, element, element_df)
         
@@ -62,21 +71,21 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
             if splittable_nodes == 'all':
                 splittable_nodes = net.bus.index
             
+            # Keep track of original buses, before copying them, so that
+            # new buses inherit the original bus column
+            net.bus['is_aux_bus'] = False
+            net.bus['original_bus'] = net.bus.index
+            
             # Copy buses and add letter designation to new buses
             aux_buses = net.bus.loc[splittable_nodes, :].copy()
             aux_buses['name'] += '_b'
+            aux_buses['is_aux_bus'] = True
             
             # Add letter designation to old buses that were copied
             net.bus.loc[splittable_nodes, 'name'] += '_a'
-            
-            # Keep track of original and new buses
-            net.bus['is_aux_bus'] = False
-            net.bus['original_bus'] = net.bus.index
-            aux_buses['is_aux_bus'] = True
-            aux_buses['original_bus'] = aux_buses.index
 
             # Change index of new buses to ensure unique indices
-            aux_buses.index += (max(net.bus.index) + 1)
+            aux_buses.index += (net.bus.index.max() + 1)
             
             # Set new buses to out of service
             aux_buses['in_service'] = False
@@ -96,24 +105,26 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
                 net.bus_geodata = pd.concat([net.bus_geodata, 
                                              aux_buses_geodata])
                   
-        # If switchable edges passed, store tuples with line endpoints
+        # If switchable edges passed, store sorted tuples with line
+        # endpoints, so that each edge has a single key
         if switchable_edges is not None:
             if switchable_edges == 'all':
                 switchable_edges = net.line.index
             switchable_edges = net.line.loc[switchable_edges]
             edge_zip = zip(switchable_edges['from_bus'],
                            switchable_edges['to_bus'])
-            edge_set_list = [frozenset(edge) for edge in edge_zip]
+            edge_set_list = [(min(edge), max(edge)) for edge in edge_zip]
             net.switchable_edges = dict(zip(edge_set_list,
                                             switchable_edges.index))
             
         # Generate main topology object for pandapower network
         net.main_topology = infer_topology(net, net.connected_subnet)
-        net.main_topology.splittable_nodes = net.splittable_nodes
-        net.main_topology.switchable_edges = net.switchable_edges
+        net.main_topology.splittable_nodes = list(net.splittable_nodes.items())
+        net.main_topology.switchable_edges = list(net.switchable_edges)
         
         # Update maps for indexing tables by element name
         net.update_name_maps()
+        net.update_position_maps()
         
         return net
     
@@ -126,11 +137,19 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
             name_map = getattr(self, element)['name']
             name_map = pd.Series(name_map.index, index=name_map)
             setattr(self, f'{element}_name_map', name_map)
+    
+    def update_position_maps(self):
+        for element in self._supported_elements:
+            setattr(self, f'{element}_position_map', 
+                    position_map(getattr(self, element).index))
               
-    def topology_search(self, k=2, node_split=True, edge_switch=True):
+    def topology_search(self, k=2, node_split=True, edge_switch=True,
+                        max_removed_edges=None, max_workers=1):
         
-        topo = topology_generator([self.main_topology], k,
-                                  node_split, edge_switch)
+        topo = list(topology_generator([self.main_topology], k,
+                                       node_split, edge_switch,
+                                       max_workers=max_workers,
+                                       max_removed_edges=max_removed_edges))
         
         self.topo = pd.Series(topo, dtype=object, name='topo')
         
@@ -184,8 +203,10 @@ class FlexibleNet(pp.auxiliary.pandapowerNet):
             
         # To do: proper handling of non-convergence
         
-        # Temporary copy of network object, adjusted for plotting
-        net = self.deepcopy()
+        # Temporary copy of network object, adjusted for plotting, only
+        # copying the tables that are changed in place
+        net = _copy_pp_net(self, self._supported_elements)
+        net._setattr('__class__', type(self))
         
         # Load flow for specified topology
         net.apply_topology(topology)
@@ -211,4 +232,16 @@ def _select_in_service(net, element):
     
     # Keep only in-service components
     setattr(net, 'res_' + element, res_df[element_df['in_service'] == True])
-    setattr(net, element, element_df[element_df['in_service'] == True])
\ No newline at end of file
+    setattr(net, element, element_df[element_df['in_service'] == True])
+
+def _copy_pp_net(pp_net, elements):
+    
+    # Shallow copy of network, sharing all tables except the given
+    # element tables, which are changed in place; result tables are
+    # shared as well, since load flows replace them rather than write
+    # into them
+    net = pp.auxiliary.pandapowerNet(dict(pp_net))
+    for element in elements:
+        net[element] = pp_net[element].copy()
+    
+    return net
\ No newline at end of file
@@ -1,49 +1,48 @@
+import numpy as np
+
 from .topology_search import Topology
 
 # To do:
 #   - Node split compatibility for transformers: respect which end is which
 
+# Largest index label, relative to the number of rows, for which a lookup
+# table of row positions is built
+_POSITION_MAP_DENSITY = 4
+
 def infer_topology(pp_net, connected_subnet):
     
-    # Extract nodes from bus table, keeping non-auxiliary buses
-    bus_list = list(pp_net.bus[pp_net.bus['is_aux_bus']==False].index)
-    
-    # Extract edges from line and trafo tables, storing index
-    line_list = list(zip(pp_net.line['from_bus'], 
-                         pp_net.line['to_bus'],
-                         [{'line':idx} for idx in pp_net.line.index]))
-    trafo_list = list(zip(pp_net.trafo['hv_bus'], 
-                          pp_net.trafo['lv_bus'],
-                          [{'trafo':idx} for idx in pp_net.trafo.index]))
-    
-    # Extract attributes from load and generator tables
-    load_list = list(zip(pp_net.load['bus'], pp_net.load.index))
-    gen_list = list(zip(pp_net.gen['bus'], pp_net.gen.index))
-    eg_list = list(zip(pp_net.ext_grid['bus'], pp_net.ext_grid.index))
-    
-    # Keep only elements in connected subnet
-    bus_list = [bus for bus in bus_list if bus in connected_subnet]
-    line_list = [line for line in line_list if (line[0] in bus_list 
-                                                and line[1] in bus_list)]
-    trafo_list = [trafo for trafo in trafo_list if (trafo[0] in bus_list 
-                                                and trafo[1] in bus_list)]
-    load_list = [line for line in load_list if line[0] in bus_list]
-    gen_list = [gen for gen in gen_list if gen[0] in bus_list]
-    eg_list = [eg for eg in eg_list if eg[0] in bus_list]
-    
-    # Build the graph
+    # Mask non-auxiliary buses in connected subnet
+    bus_mask = ((pp_net.bus['is_aux_bus']==False) 
+                & pp_net.bus.index.isin(connected_subnet))
+    bus_index = pp_net.bus.index[bus_mask]
+    
+    # Keep only elements connected to buses in connected subnet
+    lines = pp_net.line[pp_net.line['from_bus'].isin(bus_index)
+                        & pp_net.line['to_bus'].isin(bus_index)]
+    trafos = pp_net.trafo[pp_net.trafo['hv_bus'].isin(bus_index)
+                          & pp_net.trafo['lv_bus'].isin(bus_index)]
+    loads = pp_net.load[pp_net.load['bus'].isin(bus_index)]
+    gens = pp_net.gen[pp_net.gen['bus'].isin(bus_index)]
+    egs = pp_net.ext_grid[pp_net.ext_grid['bus'].isin(bus_index)]
+    
+    # Build the graph, adding edges from line and trafo tables one by one
+    # with their index, so that each edge gets a single attribute dict
     topology = Topology()
-    topology.add_nodes_from(bus_list)
-    topology.add_edges_from(line_list)
-    topology.add_edges_from(trafo_list)
-    
-    # Add node attributes
-    for bus, load in load_list:
-        topology.nodes[bus]['load'] = load  
-    for bus, gen, in gen_list:
-        topology.nodes[bus]['gen'] = gen
-    for bus, eg, in eg_list:
-        topology.nodes[bus]['ext_grid'] = eg
+    topology.add_nodes_from(bus_index.tolist())
+    for u, v, idx in zip(lines['from_bus'].tolist(), 
+                         lines['to_bus'].tolist(), lines.index.tolist()):
+        topology.add_edge(u, v, line=idx)
+    for u, v, idx in zip(trafos['hv_bus'].tolist(), 
+                         trafos['lv_bus'].tolist(), trafos.index.tolist()):
+        topology.add_edge(u, v, trafo=idx)
+    
+    # Add node attributes from load and generator tables directly to the
+    # attribute dicts of the buses, which are all in the graph
+    node_attributes = topology.nodes
+    for element, element_df in (('load', loads), ('gen', gens), 
+                                 ('ext_grid', egs)):
+        for bus, idx in zip(element_df['bus'].tolist(), element_df.index):
+            node_attributes[bus][element] = idx
     
     return topology
 
@@ -55,41 +54,87 @@ def apply_topology(pp_net,
     # Switches lines in pandapower net object, without making a copy
     
     # Create masks for acting on relevant nodes and edges
-    original_buses, aux_buses = zip(*splittable_nodes.items())
+    flexible_buses = [*splittable_nodes.keys(), *splittable_nodes.values()]
     switchable_lines = list(switchable_edges.values())
+    
+    # Mutable columns are edited as arrays and written back once each
+    bus_in_service = pp_net.bus['in_service'].to_numpy(copy=True)
+    line_in_service = pp_net.line['in_service'].to_numpy(copy=True)
        
-    # Set all buses and lines to out of service
-    pp_net.bus.loc[original_buses, 'in_service'] = False
-    pp_net.bus.loc[aux_buses, 'in_service'] = False
-    pp_net.line.loc[switchable_lines, 'in_service'] = False
+    # Set all original and auxiliary buses and lines to out of service
+    bus_in_service[positions(pp_net, 'bus', flexible_buses)] = False
+    line_in_service[positions(pp_net, 'line', switchable_lines)] = False
     
-    # Extract bus index and bus elements by iterating over nodes in topology
-    for bus, elements in topology.nodes.data():
-        
-        # Set buses from topology to in service
-        pp_net.bus.loc[bus, 'in_service'] = True
-        
-        # Set loads from topology to corresponding bus
-        if 'load' in elements:
-            pp_net.load.loc[elements['load'], 'bus'] = bus
-            
-        # Set generators from topology to corresponding bus
-        if 'gen' in elements:
-            pp_net.gen.loc[elements['gen'], 'bus'] = bus
-        
-        # Set external connections from topology to corresponding bus
-        if 'ext_grid' in elements:
-            pp_net.ext_grid.loc[elements['ext_grid'], 'bus'] = bus
+    # Set buses from topology to in service
+    buses = np.array(list(topology.nodes))
+    bus_in_service[positions(pp_net, 'bus', buses)] = True
+    pp_net.bus['in_service'] = bus_in_service
     
-    # Extract line index while iterating over edges in topology
-    for from_bus, to_bus, elements in topology.edges.data():
+    # Set loads, generators and external connections from topology to
+    # corresponding bus, collecting index arrays from node elements first
+    for element in ('load', 'gen', 'ext_grid'):
+        element_buses = np.array([(elements[element], bus) 
+                                  for bus, elements in topology.nodes.data()
+                                  if element in elements])
+        if len(element_buses) > 0:
+            element_df = getattr(pp_net, element)
+            element_bus = element_df['bus'].to_numpy(copy=True)
+            rows = positions(pp_net, element, element_buses[:, 0])
+            element_bus[rows] = element_buses[:, 1]
+            element_df['bus'] = element_bus
+    
+    # Extract line index and endpoints from edges in topology
+    line_buses = np.array([(elements['line'], from_bus, to_bus)
+                           for from_bus, to_bus, elements 
+                           in topology.edges.data()
+                           if 'line' in elements])
+    if len(line_buses) > 0:
+        rows = positions(pp_net, 'line', line_buses[:, 0])
         
-        if 'line' in elements:
-            line = elements['line']
-            
-            # Set lines from topology to in service
-            pp_net.line.loc[line, 'in_service'] = True
+        # Set lines from topology to in service
+        line_in_service[rows] = True
         
-            # Set lines from topology to corresponding bus
-            pp_net.line.loc[line, 'from_bus'] = from_bus
-            pp_net.line.loc[line, 'to_bus'] = to_bus
\ No newline at end of file
+        # Set lines from topology to corresponding buses
+        for n, column in enumerate(('from_bus', 'to_bus'), 1):
+            line_bus = pp_net.line[column].to_numpy(copy=True)
+            line_bus[rows] = line_buses[:, n]
+            pp_net.line[column] = line_bus
+    
+    pp_net.line['in_service'] = line_in_service
+
+def position_map(index):
+    
+    # Lookup table from non-negative integer index labels to row positions,
+    # stored together with the index it was built from; only built if the
+    # labels are dense enough, since its size follows the largest label
+    labels = index.to_numpy()
+    if (len(labels) == 0 or labels.min() < 0 
+            or labels.max() >= _POSITION_MAP_DENSITY*len(labels)):
+        return index, None
+    positions = np.full(labels.max() + 1, -1, dtype=np.int64)
+    positions[labels] = np.arange(len(labels))
+    
+    return index, positions
+
+def positions(pp_net, element, labels):
+    
+    # Row positions of labels in element table, from the position map if
+    # one was stored for the current index of the table
+    element_df = getattr(pp_net, element)
+    labels = np.asarray(labels, dtype=np.int64)
+    index_positions = getattr(pp_net, f'{element}_position_map', None)
+    if (index_positions is not None 
+            and index_positions[0] is element_df.index
+            and index_positions[1] is not None
+            and (len(labels) == 0 
+                 or 0 <= labels.min() <= labels.max() 
+                    < len(index_positions[1]))):
+        rows = index_positions[1][labels]
+    else:
+        rows = element_df.index.get_indexer(labels)
+    
+    # Missing labels are marked with -1, which would silently wrap around
+    if len(rows) > 0 and rows.min() < 0:
+        raise KeyError(f'{labels[rows < 0].tolist()} not in {element} index')
+    
+    return rows
@@ -0,0 +1,28 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pandapower')
+from ..pandapower import position_map, positions
+
+class Net:
+    pass
+
+@pytest.mark.parametrize('labels', [
+    [3, 0, 7, 1],
+    [0, 10**7, 5],
+    [-2, 4, 1]])
+def test_positions_match_get_indexer(labels):
+    net = Net()
+    net.bus = pd.DataFrame(index=pd.Index(labels))
+    net.bus_position_map = position_map(net.bus.index)
+    
+    rows = positions(net, 'bus', labels[::-1])
+    assert rows.tolist() == net.bus.index.get_indexer(labels[::-1]).tolist()
+    
+    with pytest.raises(KeyError):
+        positions(net, 'bus', [2])
+
+def test_position_map_only_for_dense_labels():
+    assert position_map(pd.Index([3, 0, 7, 1]))[1] is not None
+    assert position_map(pd.Index([0, 10**7, 5]))[1] is None
+    assert position_map(pd.Index([-2, 4, 1]))[1] is None
@@ -0,0 +1,251 @@
+import math
+import random
+from collections import Counter
+from itertools import combinations
+
+import networkx as nx
+import pytest
+from networkx.algorithms.connectivity import is_locally_k_edge_connected
+
+from .. import topology_search
+from ..topology_search import (Topology, check_k_edge_connectivity,
+                               topology_generator, node_split,
+                               edge_switch_recursor, _local_edge_connectivity,
+                               _EdgeSwitchCache)
+
+pn = pytest.importorskip('pandapower.networks')
+from ..flexible_pp_net import FlexibleNet
+
+def random_graphs(n_graphs, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n_graphs):
+        n = rng.randint(2, 12)
+        p = rng.uniform(0.1, 0.7)
+        yield nx.gnp_random_graph(n, p, seed=rng.randrange(2**32))
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_check_k_edge_connectivity_matches_networkx(k):
+    for graph in random_graphs(200, seed=k):
+        topology = Topology(graph)
+        for s, t in combinations(topology, 2):
+            expected = is_locally_k_edge_connected(graph, s, t, k)
+            assert check_k_edge_connectivity(topology, (s, t), k) == expected
+
+def test_local_edge_connectivity_matches_networkx():
+    for graph in random_graphs(200):
+        for s, t in combinations(graph, 2):
+            expected = nx.edge_connectivity(graph, s, t)
+            cutoff = len(graph)
+            assert _local_edge_connectivity(graph._adj, s, t, cutoff) \
+                == expected
+
+def test_flow_is_a_set_of_k_edge_disjoint_paths():
+    for graph in random_graphs(200):
+        for s, t in combinations(graph, 2):
+            flow = set()
+            if check_k_edge_connectivity(Topology(graph), (s, t), 2, flow):
+                
+                # Saturated arcs are graph edges, each used in one direction
+                assert all(graph.has_edge(u, v) for u, v in flow)
+                assert not any((v, u) in flow for u, v in flow)
+                
+                # Two more arcs leave s than enter it
+                out_s = sum(u == s for u, _ in flow)
+                in_s = sum(v == s for _, v in flow)
+                assert out_s - in_s == 2
+
+def _reference_generator(topology, k):
+    
+    # Search as in the original recursion, on full copies of plain
+    # graphs, with splittable nodes and switchable edges in dicts
+    def copy(t):
+        c = t.copy()
+        c.splittable_nodes = dict(t.splittable_nodes)
+        c.switchable_edges = dict(t.switchable_edges)
+        return c
+    
+    def apply_split(t, comb, node_pair):
+        for edge in comb:
+            attributes = t.edges[edge]
+            t.remove_edge(*edge)
+            new_edge = (node_pair[1], edge[1])
+            t.add_edge(*new_edge, **attributes)
+            if frozenset(edge) in t.switchable_edges:
+                value = t.switchable_edges.pop(frozenset(edge))
+                t.switchable_edges[frozenset(new_edge)] = value
+    
+    def subsplits(t, node_pair):
+        elements = list(t.nodes[node_pair[0]].items())
+        for n in range(1, len(elements)+1):
+            for sub_comb in combinations(elements, n):
+                sub = copy(t)
+                for element in sub_comb:
+                    sub.nodes[node_pair[0]].pop(element[0])
+                    sub.nodes[node_pair[1]][element[0]] = element[1]
+                yield sub
+    
+    def split_topologies(t, combs, node_pair):
+        for comb in combs:
+            new = copy(t)
+            apply_split(new, comb, node_pair)
+            if is_locally_k_edge_connected(new, *node_pair, k):
+                yield new
+                if new.nodes[node_pair[0]]:
+                    yield from subsplits(new, node_pair)
+    
+    def node_split(t, node_pair):
+        deg = t.degree[node_pair[0]]
+        edges = [(node_pair[0], n) for n in t.adj[node_pair[0]]]
+        if deg >= 2*k:
+            for split in range(k, math.ceil(deg/2)):
+                yield from split_topologies(t, combinations(edges, split),
+                                            node_pair)
+            if deg % 2 == 0:
+                first_edge = edges.pop()
+                combs = ((first_edge, *comb) for comb 
+                         in combinations(edges, deg//2 - 1))
+                yield from split_topologies(t, combs, node_pair)
+    
+    def node_split_recursor(t):
+        if t.splittable_nodes:
+            node_pair = t.splittable_nodes.popitem()
+            for new in [t, *node_split(t, node_pair)]:
+                yield from node_split_recursor(new)
+        else:
+            yield t
+    
+    def edge_switch_recursor(t):
+        if t.switchable_edges:
+            edge = tuple(t.switchable_edges.popitem()[0])
+            new_list = []
+            if t.degree[edge[0]] >= k and t.degree[edge[1]] >= k:
+                new = copy(t)
+                new.remove_edge(*edge)
+                if is_locally_k_edge_connected(new, *edge, k):
+                    new_list.append(new)
+            for new in [t, *new_list]:
+                yield from edge_switch_recursor(new)
+        else:
+            yield t
+    
+    for t in node_split_recursor(copy(topology)):
+        yield from edge_switch_recursor(t)
+
+def _signature(topology):
+    
+    # Hashable description of buses with their elements and of edges
+    nodes = frozenset((n, frozenset(d.items())) 
+                      for n, d in topology.nodes(data=True))
+    edges = frozenset((frozenset((u, v)), frozenset(d.items()))
+                      for u, v, d in topology.edges(data=True))
+    return nodes, edges
+
+@pytest.mark.parametrize('case, splittable_nodes, k', [
+    ('case9', 'all', 1),
+    ('case9', 'all', 2),
+    ('case14', [1, 3, 4], 2)])
+def test_topology_generator_matches_reference(case, splittable_nodes, k):
+    net = FlexibleNet.from_pp_net(getattr(pn, case)(), 
+                                  splittable_nodes=splittable_nodes)
+    main_topology = net.main_topology
+    
+    reference = nx.Graph(main_topology)
+    reference.splittable_nodes = dict(main_topology.splittable_nodes)
+    reference.switchable_edges = {frozenset(e): None 
+                                  for e in main_topology.switchable_edges}
+    expected = Counter(map(_signature, _reference_generator(reference, k)))
+    
+    found = Counter(map(_signature, topology_generator([main_topology], k)))
+    assert found == expected
+
+def test_edge_switch_outputs_do_not_share_changes():
+    net = FlexibleNet.from_pp_net(pn.case9())
+    topologies = list(topology_generator([net.main_topology], 1, 
+                                         node_split=False))
+    signatures = [_signature(t) for t in topologies]
+    
+    # Change every output in turn through the graph methods
+    for topology in topologies:
+        u, v = next(iter(topology.edges))
+        attributes = topology.edges[u, v]
+        topology.remove_edge(u, v)
+        topology.add_edge(u, 'extra')
+        topology.nodes[u]['extra'] = True
+        
+        # Other outputs are unaffected, in both directions of each edge
+        for other, signature in zip(topologies, signatures):
+            if other is not topology:
+                assert _signature(other) == signature
+                assert all(other.has_edge(b, a) for a, b in other.edges)
+        
+        topology.remove_node('extra')
+        topology.add_edge(u, v, **attributes)
+        del topology.nodes[u]['extra']
+
+def test_parallel_topology_generator_matches_serial():
+    net = FlexibleNet.from_pp_net(pn.case14(), splittable_nodes=[1, 3, 4])
+    serial = topology_generator([net.main_topology], 2)
+    parallel = topology_generator([net.main_topology], 2, max_workers=2)
+    assert list(map(_signature, parallel)) == list(map(_signature, serial))
+
+def test_parallel_topology_generator_stops_early():
+    net = FlexibleNet.from_pp_net(pn.case14(), splittable_nodes=[1, 3, 4])
+    serial = topology_generator([net.main_topology], 2)
+    parallel = topology_generator([net.main_topology], 2, max_workers=2)
+    assert _signature(next(parallel)) == _signature(next(serial))
+    parallel.close()
+
+@pytest.mark.parametrize('n_outputs', [1, 2, 5])
+def test_stopped_search_leaves_input_unchanged(n_outputs):
+    net = FlexibleNet.from_pp_net(pn.case14())
+    topology = net.main_topology.copy()
+    signature = _signature(topology)
+    switchable_edges = topology.switchable_edges
+    
+    search = edge_switch_recursor(topology, 1)
+    for _ in range(n_outputs):
+        next(search)
+    search.close()
+    assert _signature(topology) == signature
+    assert topology.switchable_edges == switchable_edges
+    assert topology.number_of_removed_edges == 0
+    
+    node_pair = max(topology.splittable_nodes, 
+                    key=lambda node_pair: topology.degree[node_pair[0]])
+    search = node_split(topology, node_pair, 1)
+    for _ in range(n_outputs):
+        next(search)
+    search.close()
+    assert _signature(topology) == signature
+
+@pytest.mark.parametrize('max_removed_edges', [0, 1, 2])
+def test_max_removed_edges_bounds_edge_switches(max_removed_edges):
+    net = FlexibleNet.from_pp_net(pn.case9())
+    n_edges = net.main_topology.number_of_edges()
+    topologies = list(topology_generator([net.main_topology], 1, 
+                                         node_split=False,
+                                         max_removed_edges=max_removed_edges))
+    unbounded = topology_generator([net.main_topology], 1, node_split=False)
+    expected = [t for t in map(_signature, unbounded) 
+                if n_edges - len(t[1]) <= max_removed_edges]
+    assert Counter(map(_signature, topologies)) == Counter(expected)
+
+def test_edge_switch_cache_bounds_stored_switches(monkeypatch):
+    monkeypatch.setattr(topology_search, '_EDGE_SWITCH_CACHE_SIZE', 4)
+    cache = _EdgeSwitchCache()
+    for key, size in enumerate([2, 1, 3, 5, 4]):
+        cache.store(key, [(n,) for n in range(size)])
+        assert cache.size == sum(map(len, cache.values())) <= 4
+    assert list(cache) == [4]
+
+def test_setters_store_pairs():
+    topology = Topology(splittable_nodes={1: 11, 2: 12},
+                        switchable_edges=[(2, 1), [3, 4], frozenset((6, 5))])
+    assert topology.splittable_nodes == ((1, 11), (2, 12))
+    assert topology.switchable_edges == ((1, 2), (3, 4), (5, 6))
+    
+    for value in [[1, 2], ['ab'], [(1, 2, 3)]]:
+        with pytest.raises(TypeError):
+            topology.splittable_nodes = value
+        with pytest.raises(TypeError):
+            topology.switchable_edges = value
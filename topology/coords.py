@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, Iterator, Hashable, Set
-from typing import TypeVar, Type
+from typing import TYPE_CHECKING, TypeVar, Type
 
 from itertools import product, chain, repeat
 from functools import reduce
+from operator import itemgetter
 
 from ..core.itertools import chainmap
 from .abc import TopoData
@@ -77,17 +78,30 @@ class TopoTuple(tuple[ECoord, NCoord], Topology):
     
     __slots__ = ()
     
-    @property
-    def e_coord(self) -> ECoord:
-        """The set of edge changes to the topology."""
+    # Item getters avoid a Python function call on every access; type
+    # checkers see the equivalent typed properties instead
+    
+    if TYPE_CHECKING:
+        
+        @property
+        def e_coord(self) -> ECoord:
+            """The set of edge changes to the topology."""
+            
+            return self[0]
         
-        return self[0]
+        @property
+        def n_coord(self) -> NCoord:
+            """The set of node changes to the topology."""
+            
+            return self[1]
     
-    @property
-    def n_coord(self) -> NCoord:
-        """The set of node changes to the topology."""
+    else:
+        
+        e_coord = property(itemgetter(0),
+                           doc='The set of edge changes to the topology.')
         
-        return self[1]
+        n_coord = property(itemgetter(1),
+                           doc='The set of node changes to the topology.')
     
     @classmethod
     def factory(cls: Type[Topo], 
@@ -1,26 +1,173 @@
 import networkx as nx
-from networkx.algorithms.connectivity import is_locally_k_edge_connected
 import math
-from itertools import combinations
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, combinations, islice
+
+# Number of tuples of switched edges that pass that are memoized
+_EDGE_SWITCH_CACHE_SIZE = 2**14
+
+# Number of topologies with split nodes per edge switch search in a worker
+# process, and number of such searches submitted per worker at a time
+_PARALLEL_CHUNK_SIZE = 64
+_PARALLEL_CHUNKS_PER_WORKER = 2
        
 class Topology(nx.Graph):
     def __init__(self, *args, **kwargs):
-        self.splittable_nodes = kwargs.pop('splittable_nodes', {})
-        self.switchable_edges = kwargs.pop('switchable_edges', {})
+        self.splittable_nodes = kwargs.pop('splittable_nodes', ())
+        self.switchable_edges = kwargs.pop('switchable_edges', ())
         self.number_of_removed_edges = 0
+        self._owned = None
         super(Topology, self).__init__(*args, **kwargs)
+    
+    # Splittable nodes and switchable edges are stored as tuples, which are
+    # replaced rather than changed, so copies can share them; the search
+    # replaces them through the underlying attributes, since it only ever
+    # stores pairs that were already checked
+    @property
+    def splittable_nodes(self):
+        return self._splittable_nodes
+    
+    # Node pairs of original and auxiliary node, also taken from a mapping
+    # of original to auxiliary nodes
+    @splittable_nodes.setter
+    def splittable_nodes(self, value):
+        if isinstance(value, Mapping):
+            value = value.items()
+        self._splittable_nodes = tuple(map(_pair, value))
+        
+    @property
+    def switchable_edges(self):
+        return self._switchable_edges
+    
+    # Edges are stored with sorted endpoints, so that each edge has a
+    # single key
+    @switchable_edges.setter
+    def switchable_edges(self, value):
+        self._switchable_edges = tuple((min(e), max(e)) 
+                                       for e in map(_pair, value))
+    
+    # Edge switch outputs share the adjacency of nodes whose edges do not
+    # change: such topologies keep the set of nodes whose adjacency they
+    # own, and copy the adjacency of other nodes before changing it
+    def _own(self, *nodes):
+        owned = self._owned
+        if owned is not None:
+            adj = self._adj
+            for n in nodes:
+                if n not in owned and n in adj:
+                    adj[n] = adj[n].copy()
+                    owned.add(n)
+                    
+    def _own_all(self):
+        if self._owned is not None:
+            self._own(*list(self._adj))
+            self._owned = None
+    
+    def add_edge(self, u, v, **attr):
+        self._own(u, v)
+        super(Topology, self).add_edge(u, v, **attr)
+        
+    def add_edges_from(self, ebunch_to_add, **attr):
+        self._own_all()
+        super(Topology, self).add_edges_from(ebunch_to_add, **attr)
+        
+    def add_weighted_edges_from(self, ebunch_to_add, weight='weight', 
+                                **attr):
+        self._own_all()
+        super(Topology, self).add_weighted_edges_from(ebunch_to_add, weight,
+                                                      **attr)
+        
+    def remove_edge(self, u, v):
+        self._own(u, v)
+        super(Topology, self).remove_edge(u, v)
+        
+    def remove_edges_from(self, ebunch):
+        self._own_all()
+        super(Topology, self).remove_edges_from(ebunch)
+        
+    def remove_node(self, n):
+        self._own_all()
+        super(Topology, self).remove_node(n)
+        
+    def remove_nodes_from(self, nodes):
+        self._own_all()
+        super(Topology, self).remove_nodes_from(nodes)
         
+    def clear(self):
+        super(Topology, self).clear()
+        self._owned = None
+        
+    def clear_edges(self):
+        self._own_all()
+        super(Topology, self).clear_edges()
+    
     def copy(self, *args, **kwargs):
         T = super(Topology, self).copy(*args, **kwargs)
         
-        # Shallow copy of splittable nodes and switchable edges
-        T.splittable_nodes = self.splittable_nodes.copy()
-        T.switchable_edges = self.switchable_edges.copy()
+        # Share splittable nodes and switchable edges
+        T._splittable_nodes = self._splittable_nodes
+        T._switchable_edges = self._switchable_edges
         
         T.number_of_removed_edges = self.number_of_removed_edges
         
         return T
 
+def _pair(value):
+    
+    # Checks that a splittable node or switchable edge is a pair of nodes
+    if (isinstance(value, (str, bytes)) or not hasattr(value, '__len__')
+            or len(value) != 2):
+        raise TypeError(f'expected a pair of nodes, not {value!r}')
+    
+    return tuple(value)
+
+class _EdgeSwitchCache(dict):
+    
+    # Memo of the switched edges that pass per edge set, which evicts the
+    # oldest edge sets once too many switch tuples are stored in total
+    def __init__(self):
+        super(_EdgeSwitchCache, self).__init__()
+        self.size = 0
+        
+    def store(self, key, switched_list):
+        
+        # Results that are larger than the whole cache are not kept
+        if len(switched_list) > _EDGE_SWITCH_CACHE_SIZE:
+            return
+        while self.size + len(switched_list) > _EDGE_SWITCH_CACHE_SIZE:
+            self.size -= len(self.pop(next(iter(self))))
+        self[key] = switched_list
+        self.size += len(switched_list)
+
+def _fast_copy(topology, changing=None):
+    
+    # Copies adjacency and node attributes, but shares edge attributes,
+    # which are only ever replaced by removing and adding edges
+    T = Topology()
+    T.graph.update(topology.graph)
+    T._node = {n: d.copy() for n, d in topology._node.items()}
+    if changing is None:
+        T._adj = {n: nbrs.copy() for n, nbrs in topology._adj.items()}
+    
+    # If the only nodes whose edges will change are given, the adjacency
+    # of all other nodes is shared, and copied once either topology
+    # changes it
+    else:
+        T._adj = topology._adj.copy()
+        for n in changing:
+            T._adj[n] = T._adj[n].copy()
+        T._owned = set(changing)
+    
+    # Share splittable nodes and switchable edges
+    T._splittable_nodes = topology._splittable_nodes
+    T._switchable_edges = topology._switchable_edges
+    
+    T.number_of_removed_edges = topology.number_of_removed_edges
+    
+    return T
+
 def check_node_min_degree(topology, node, min_degree):
     pass
 
@@ -30,201 +177,481 @@ def check_edge_min_degree(topology, edge, min_degree):
         check &= (topology.degree[node] >= min_degree)
     return check
 
-def check_k_edge_connectivity(topology, edge, k):
-    if is_locally_k_edge_connected(topology, edge[0], edge[1], k):
-        return True
-    else:
+def check_k_edge_connectivity(topology, edge, k, flow=None):
+    
+    if k < 1:
+        raise ValueError(f'k must be positive, not {k}')
+    
+    # Quickly rule out endpoints with too few edges
+    adj = topology._adj
+    if len(adj[edge[0]]) < k or len(adj[edge[1]]) < k:
         return False
     
+    # Single path only requires the endpoints to be connected, unless
+    # the path itself is asked for
+    if k == 1 and flow is None:
+        return _connected(adj, edge[0], edge[1])
+    
+    # Search augmenting paths directly on the adjacency dicts, which
+    # stops as soon as the other endpoint is reached
+    return _local_edge_connectivity(adj, edge[0], edge[1], k, flow) >= k
+
+def _connected(adj, s, t):
+    
+    # Bidirectional breadth-first search that expands the smaller frontier,
+    # stopping when the frontiers meet or when either side runs out, e.g.
+    # when the removed edge cut off only a small part of the graph
+    seen_s, seen_t = {s}, {t}
+    frontier_s, frontier_t = [s], [t]
+    while frontier_s and frontier_t:
+        if len(frontier_s) > len(frontier_t):
+            frontier_s, frontier_t = frontier_t, frontier_s
+            seen_s, seen_t = seen_t, seen_s
+        next_frontier = []
+        for u in frontier_s:
+            for v in adj[u]:
+                if v in seen_t:
+                    return True
+                if v not in seen_s:
+                    seen_s.add(v)
+                    next_frontier.append(v)
+        frontier_s = next_frontier
+    
+    return False
+
+def _local_edge_connectivity(adj, s, t, cutoff, flow=None):
+    
+    # Number of edge-disjoint paths between s and t, up to cutoff, from
+    # unit capacity max flow with breadth-first augmenting paths; flow
+    # is kept as the set of saturated arcs, which is filled in if given
+    saturated = set() if flow is None else flow
+    for n_paths in range(cutoff):
+        
+        # Search path in residual graph, stopping when t is discovered
+        pred = {s: None}
+        queue = deque([s])
+        found = False
+        while queue and not found:
+            u = queue.popleft()
+            for v in adj[u]:
+                if v not in pred and (u, v) not in saturated:
+                    pred[v] = u
+                    if v == t:
+                        found = True
+                        break
+                    queue.append(v)
+        
+        if not found:
+            return n_paths
+        
+        # Augment flow along path, cancelling flow in opposite direction
+        v = t
+        while v != s:
+            u = pred[v]
+            if (v, u) in saturated:
+                saturated.remove((v, u))
+            else:
+                saturated.add((u, v))
+            v = u
+    
+    return cutoff
+
 def topology_generator(full_topology_list, k=2,
-                       node_split=True, edge_switch=True):
+                       node_split=True, edge_switch=True, max_workers=1,
+                       max_removed_edges=None):
+    
+    # Topologies are generated lazily: call list() to materialize them
+    
+    # Search edge switches in worker processes if requested
+    if max_workers > 1 and edge_switch:
+        return _parallel_topology_generator(full_topology_list, k,
+                                            node_split, max_workers,
+                                            max_removed_edges)
     
     # Copy full topology objects to leave the original unchanged
-    input_topology_list = [t.copy() for t in full_topology_list]
+    topologies = (t.copy() for t in full_topology_list)
     
     # Node split recursion for every input topology
     if node_split:
-        output_topology_list = []
-        for topology in input_topology_list:
-            output_topology_list.extend(node_split_recursor(topology, k))
-            
-        # Set resulting topologies as new input toplogies
-        input_topology_list = output_topology_list[:]
+        topologies = (t for topology in topologies
+                      for t in node_split_recursor(topology, k))
        
-    # Edge switch recursion for every input topology
+    # Edge switch recursion for every input topology, memoizing switched
+    # edges for the duration of this search only
     if edge_switch:
-        output_topology_list = []
-        for topology in input_topology_list:
-            output_topology_list.extend(edge_switch_recursor(topology, k))
+        cache = _EdgeSwitchCache()
+        topologies = (t for topology in topologies
+                      for t in edge_switch_recursor(topology, k,
+                                                    max_removed_edges,
+                                                    cache))
         
-    return output_topology_list
+    return topologies
+
+def _parallel_topology_generator(full_topology_list, k, node_split,
+                                 max_workers, max_removed_edges):
+    
+    # Node splits are generated in this process, after which the edge
+    # switch search, which makes up most of the work, is distributed over
+    # worker processes in chunks of consecutive topologies with split
+    # nodes, which keep subsplits with identical edges together
+    topologies = topology_generator(full_topology_list, k, node_split,
+                                    edge_switch=False)
+    chunks = iter(lambda: list(islice(topologies, _PARALLEL_CHUNK_SIZE)), [])
+    
+    # Node splits are generated only as far as the chunks that are
+    # submitted, which are kept at a fixed number ahead of the output
+    executor = ProcessPoolExecutor(max_workers)
+    pending = deque()
+    try:
+        for chunk in islice(chunks, _PARALLEL_CHUNKS_PER_WORKER*max_workers):
+            pending.append(executor.submit(_edge_switch_search, chunk, k,
+                                           max_removed_edges))
+        while pending:
+            topology_list = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(_edge_switch_search, chunk, k,
+                                               max_removed_edges))
+            yield from topology_list
+    
+    # If the output stops early, chunks that have not started are dropped
+    # rather than waited for
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _edge_switch_search(topologies, k, max_removed_edges):
+    
+    # Edge switch search for a chunk of topologies within a worker
+    # process, memoizing switched edges for this chunk only
+    cache = _EdgeSwitchCache()
+    return [t for topology in topologies 
+            for t in edge_switch_recursor(topology, k, max_removed_edges,
+                                          cache)]
 
 def node_split_recursor(input_topology, k=2):
     
-    # Check if splittable nodes remain
-    if input_topology.splittable_nodes:
-            
-        # Remove node pair from dictionary of splittable nodes
-        node_pair = input_topology.splittable_nodes.popitem()
-        
-        # Check degree
+    # Depth-first traversal with explicit worklist of topology iterators
+    worklist = [iter([input_topology])]
+    
+    while worklist:
+        topology = next(worklist[-1], None)
         
-        # Execute node split
-        new_topology_list = node_split(input_topology, node_pair, k)
+        # Drop exhausted iterators
+        if topology is None:
+            worklist.pop()
         
-        # Recursion for new topologies including input topology
-        recursion_list = [input_topology, *new_topology_list]
-        output_topology_list = []
-        for topology in recursion_list:
-            output_topology_list.extend(node_split_recursor(topology, k))
+        # Check if splittable nodes remain
+        elif topology.splittable_nodes:
             
-        return output_topology_list
-             
-    else:
-        return [input_topology]
+            # Remove last node pair from splittable nodes
+            node_pair = topology.splittable_nodes[-1]
+            topology._splittable_nodes = topology.splittable_nodes[:-1]
+            
+            # Check degree
+            
+            # Visit new topologies before input topology, since the
+            # latter is still being copied while they are generated
+            new_topologies = node_split(topology, node_pair, k)
+            worklist.append(chain(new_topologies, [topology]))
+            
+        else:
+            yield topology
 
-def edge_switch_recursor(input_topology, k=2):
+def edge_switch_recursor(input_topology, k=2, max_removed_edges=None,
+                         cache=None):
     
-    # Check if switchable edges remain
-    if input_topology.switchable_edges:
-        
-        # Remove edge from dictionary of switchable edges
-        edge = tuple(input_topology.switchable_edges.popitem()[0])
-        
-        # Check degree
-        
-        # Execute edge switch
-        new_topology_list = edge_switch(input_topology, edge, k)
+    # Depth-first traversal that removes edges from the input topology
+    # and restores them when backtracking, copying only for output
+    topology = input_topology
+    
+    # Bound on the depth of the traversal, since every level removes an
+    # edge: branches are not extended once the bound is reached
+    if max_removed_edges is None:
+        max_depth = math.inf
+    else:
+        max_depth = max_removed_edges - topology.number_of_removed_edges
+    
+    # Switch edges in the order they would be popped from the list
+    switchable_edges = topology.switchable_edges
+    edges = list(reversed(switchable_edges))
+    topology._switchable_edges = ()
+    
+    # No edges are switched once the bound is reached
+    if max_depth <= 0:
+        yield topology
+        return
+    
+    # Only endpoints of switchable edges change, so output copies share
+    # the adjacency of all other nodes with the input topology, which
+    # from then on owns only the adjacency of these endpoints
+    changing = set(chain.from_iterable(edges))
+    topology._own(*changing)
+    topology._owned = set(changing)
+    
+    # Worklist of removed edges with the subsequent edges that passed
+    # when they were checked, together with the position of the next one
+    worklist = []
+    completed = False
+    try:
         
-        # Recursion for new topologies including input topology
-        recursion_list = [input_topology, *new_topology_list]
-        output_topology_list = []
-        for topology in recursion_list:
-            output_topology_list.extend(edge_switch_recursor(topology, k))
+        # Topologies with identical edges recur, e.g. for every subsplit,
+        # so the sets of switched edges that pass are memoized per edge
+        # set in the cache if one is given; switchable edges are sorted
+        # tuples, so equal edges give equal keys
+        if cache is not None:
+            key = (frozenset(topology.edges), tuple(edges), k, max_depth)
+        if cache is not None and key in cache:
+            yield from _replay_edge_switches(topology, edges, changing,
+                                             cache[key])
+        else:
+            passed = _passing_edges(topology, edges, 
+                                    [(n, None) for n in range(len(edges))],
+                                    k)
+            worklist.append((None, passed, 0))
+            switched = []
+            switched_list = []
             
-        return output_topology_list
-             
-    else:
-        return [input_topology]
+            while worklist:
+                removed, candidates, i = worklist[-1]
+                
+                # Restore removed edge when its subsequent edges are
+                # exhausted
+                if i == len(candidates):
+                    worklist.pop()
+                    if removed is not None:
+                        restore_edge(topology, *removed)
+                        switched.pop()
+                        
+                # Switch edge that passed, keep copy and continue from
+                # there, adding it to the worklist before the copy is
+                # yielded, so that it is restored if the search stops
+                else:
+                    worklist[-1] = (removed, candidates, i+1)
+                    n = candidates[i][0]
+                    attributes = topology.edges[edges[n]]
+                    topology.remove_edge(*edges[n])
+                    topology.number_of_removed_edges += 1
+                    worklist.append(((edges[n], attributes), [], 0))
+                    switched.append(n)
+                    switched_list.append(tuple(switched))
+                    yield _fast_copy(topology, changing)
+                    
+                    # Edges that fail here fail in every topology below,
+                    # since removing edges never increases degree or
+                    # connectivity
+                    if len(switched) < max_depth:
+                        subsequent = _passing_edges(topology, edges, 
+                                                    candidates[i+1:], k, 
+                                                    edges[n])
+                        worklist[-1] = ((edges[n], attributes), 
+                                        subsequent, 0)
+            
+            if cache is not None:
+                cache.store(key, switched_list)
+        
+        completed = True
+    
+    # If the search stops early, restore edges that are still removed and
+    # the switchable edges, leaving the input topology as it was
+    finally:
+        for removed, _, _ in reversed(worklist):
+            if removed is not None:
+                restore_edge(topology, *removed)
+        if not completed:
+            topology._switchable_edges = switchable_edges
+    
+    # Input topology is unchanged after all edges are restored
+    yield topology
+
+def _passing_edges(topology, edges, candidates, k, removed=None):
+    
+    # Indices of candidate edges whose switch passes, leaving the
+    # topology unchanged, each with the flow along the k edge-disjoint
+    # paths found for it; a flow that does not use the edge removed since
+    # it was found still holds, so the check need not be repeated
+    passed = []
+    for n, flow in candidates:
+        if flow is None or removed in flow or removed[::-1] in flow:
+            flow = set() if k > 1 else None
+            attributes = edge_switch(topology, edges[n], k, flow)
+            if attributes is None:
+                continue
+            restore_edge(topology, edges[n], attributes)
+        passed.append((n, flow))
+    
+    return passed
+
+def _replay_edge_switches(topology, edges, changing, switched_list):
+    
+    # Applies memoized edge switches to copies without checks
+    for switched in switched_list:
+        new_topology = _fast_copy(topology, changing)
+        for n in switched:
+            new_topology.remove_edge(*edges[n])
+        new_topology.number_of_removed_edges += len(switched)
+        yield new_topology
 
 def node_split(topology, node_pair, k=2):
     
     # To do:
     # - Unnecessary check of degree?
-    # - Check k-edge-connectedness before copying?
-    
-    new_topology_list = []
     
     # Obtain degree and neighboring edges
     deg = topology.degree[node_pair[0]]
-    neighbors = list(topology.adj[node_pair[0]])
-    edges = [(node_pair[0], n) for n in neighbors]
+    edges = [(node_pair[0], n) for n in topology.adj[node_pair[0]]]
+    
+    # Neighbors without other edges end every path that enters them, so
+    # they do not count towards the k paths between the split nodes
+    leaves = {n for _, n in edges if len(topology._adj[n]) < 2}
     
     # Check if degree is high enough for bus split
-    if deg >= 2*k:
+    if deg - len(leaves) >= 2*k:
         
         max_uneven_split = math.ceil(deg/2)
-        splits = list(range(k, max_uneven_split))
+        splits = range(k, max_uneven_split)
         
         # Iterate over total number of edges to be moved to other node
         for split in splits:
 
             # Obtain all combinations for this number of edges
             combs = combinations(edges, split)
-                
-            # Create new topology for each combination
-            for comb in combs:
-                new_topology = topology.copy()
-                apply_split(new_topology, comb, node_pair)
-                
-                # Check k-edge connectivity
-                if check_k_edge_connectivity(new_topology, 
-                                             node_pair, k):
-        
-                    # If check passed, keep topology
-                    new_topology_list.append(new_topology)
-                    
-                    # Create subsplits for node element combinations
-                    if new_topology.nodes[node_pair[0]]:
-                        sub_list = generate_subsplits(new_topology,
-                                                      node_pair)
-                        new_topology_list.extend(sub_list)
+            yield from _split_topologies(topology, combs, node_pair, k,
+                                         leaves)
             
         # If degree is even, compute unique half splits
         if (deg%2 == 0):
             half_split = int(deg/2) - 1
             
-            # Take arbitrary first edge
+            # Take arbitrary first edge and include it in combinations
             first_edge = edges.pop()
-            combs = combinations(edges, half_split)
-            
-            # Create new topology for each combination
-            for comb in combs:
-                new_topology = topology.copy()
-                
-                # Include first edge
-                full_comb = (first_edge, *comb)
-                apply_split(new_topology, full_comb, node_pair)
-                
-                # Check k-edge connectivity
-                if check_k_edge_connectivity(new_topology, 
-                                             node_pair, k):
+            combs = ((first_edge, *comb) 
+                     for comb in combinations(edges, half_split))
+            yield from _split_topologies(topology, combs, node_pair, k,
+                                         leaves)
+
+def _split_topologies(topology, combs, node_pair, k, leaves):
+    
+    # Splits topology in place for each combination and checks it,
+    # copying only the splits that pass before undoing them
+    deg = len(topology._adj[node_pair[0]])
+    for comb in combs:
         
-                    # If check passed, keep topology
-                    new_topology_list.append(new_topology)
+        # Skip splits that leave either node with fewer than k neighbors
+        # through which a path can continue
+        if leaves:
+            moved_leaves = sum(edge[1] in leaves for edge in comb)
+            if (len(comb) - moved_leaves < k 
+                    or deg - len(comb) - len(leaves) + moved_leaves < k):
+                continue
+        
+        undo = split_in_place(topology, comb, node_pair)
+        try:
+            if check_k_edge_connectivity(topology, node_pair, k):
+                new_topology = _fast_copy(topology)
+            else:
+                new_topology = None
+        finally:
+            undo_split(topology, undo)
+        
+        # If check passed, keep topology
+        if new_topology is not None:
                     
-                    # Create subsplits for node element combinations
-                    if new_topology.nodes[node_pair[0]]:
-                        sub_list = generate_subsplits(new_topology,
-                                                      node_pair)
-                        new_topology_list.extend(sub_list)
-                       
-    return new_topology_list
+            # Create subsplits for node element combinations
+            if new_topology.nodes[node_pair[0]]:
+                yield from generate_subsplits(new_topology, node_pair)
+            
+            yield new_topology
 
-def edge_switch(topology, edge, k=2):
+def edge_switch(topology, edge, k=2, flow=None):
     
-    # To do:
-    # - Max depth?
-    # - Check k-edge-connectedness before copying?
-    
-    new_topology_list = []
-        
-    # Create copy of topology object and remove edge
-    new_topology = topology.copy()
-    new_topology.remove_edge(*edge)
+    # Removes edge without copying topology if checks pass, returning 
+    # edge attributes for restoring the edge, or None otherwise
     
     # Check degree
     if check_edge_min_degree(topology, edge, k):
-    
-        # Check k-edge connectivity
-        if check_k_edge_connectivity(new_topology, edge, k):
         
-            # If check passed, keep topology
-            new_topology_list.append(new_topology)
+        # Remove edge directly from the adjacency and check k-edge
+        # connectivity
+        u, v = edge
+        topology._own(u, v)
+        adj = topology._adj
+        attributes = adj[u].pop(v)
+        del adj[v][u]
+        topology.number_of_removed_edges += 1
+        passed = False
+        try:
+            passed = check_k_edge_connectivity(topology, edge, k, flow)
+        
+        # If check failed or did not finish, restore edge
+        finally:
+            if not passed:
+                restore_edge(topology, edge, attributes)
+        if passed:
+            return attributes
+    
+    return None
+
+def restore_edge(topology, edge, attributes):
     
-    return new_topology_list
+    # Undoes edge switch, putting the edge attributes back directly
+    u, v = edge
+    topology._own(u, v)
+    adj = topology._adj
+    adj[u][v] = adj[v][u] = attributes
+    topology.number_of_removed_edges -= 1
 
 def apply_split(topology, combination, node_pair):
     
     # Applies node split without copying topology
+    node, new_node = node_pair
+    adj = topology._adj
+    if new_node not in adj:
+        topology.add_node(new_node)
+    topology._own(node, new_node, *(edge[1] for edge in combination))
 
-    # Switch every edge in combination to alternative node
+    # Switch every edge in combination to alternative node, moving the
+    # edge attributes along without going through the graph methods
     for edge in combination:
+        attributes = adj[node].pop(edge[1])
+        del adj[edge[1]][node]
+        adj[new_node][edge[1]] = adj[edge[1]][new_node] = attributes
         
-        # Keep track of old edge attributes
-        attributes = topology.edges[edge]
-        
-        # Remove old edge
-        topology.remove_edge(*edge)
-        
-        # Add new edge
-        new_edge = (node_pair[1], edge[1])
-        topology.add_edge(*new_edge, **attributes)
-        
-        # Change edge in dictionary of switchable edges
-        if frozenset(edge) in topology.switchable_edges:
-            attribute = topology.switchable_edges.pop(frozenset(edge))
-            topology.switchable_edges[frozenset(new_edge)] = attribute
+    # Change edges in switchable edges, moving them to the end
+    switchable_edges = topology.switchable_edges
+    if switchable_edges:
+        new_edges = {(min(edge), max(edge)): (min(new_node, edge[1]),
+                                              max(new_node, edge[1]))
+                     for edge in combination}
+        if not new_edges.keys().isdisjoint(switchable_edges):
+            topology._switchable_edges = (
+                *(e for e in switchable_edges if e not in new_edges),
+                *(new_edges[e] for e in new_edges if e in switchable_edges))
+            
+def split_in_place(topology, combination, node_pair):
+    
+    # Applies node split to the topology itself, on copies of the
+    # adjacency of the affected nodes, returning what undoes the split
+    adj = topology._adj
+    affected = {*node_pair, *(edge[1] for edge in combination)}
+    adjacency = {n: adj[n] for n in affected if n in adj}
+    owned = topology._owned
+    undo = (adjacency, affected.difference(adjacency),
+            topology._switchable_edges, 
+            None if owned is None else owned.copy())
+    for n in adjacency:
+        adj[n] = adj[n].copy()
+    apply_split(topology, combination, node_pair)
+    
+    return undo
+
+def undo_split(topology, undo):
+    
+    # Restores the original adjacency, leaving the order of edges intact,
+    # and removes nodes that were added by the split
+    adjacency, added, topology._switchable_edges, topology._owned = undo
+    topology._adj.update(adjacency)
+    for n in added:
+        del topology._adj[n]
+        del topology._node[n]
             
 def generate_subsplits(topology, node_pair):
     
@@ -234,21 +661,14 @@ def generate_subsplits(topology, node_pair):
     elements = topology.nodes[node_pair[0]]
     elements = list(elements.items())
     
-    sub_comb_list = []
-    
     # Generate combinations of distributing elements over node pair
-    for n in range(len(elements)):
-        sub_combs = list(combinations(elements, n+1))
-        sub_comb_list.extend(sub_combs)
-        
-    sub_topology_list = []
+    sub_combs = chain.from_iterable(combinations(elements, n)
+                                    for n in range(1, len(elements)+1))
     
     # Generate sub topology for each combination
-    for sub_comb in sub_comb_list:
-        sub_topology = topology.copy()
+    for sub_comb in sub_combs:
+        sub_topology = _fast_copy(topology)
         for element in sub_comb:
             sub_topology.nodes[node_pair[0]].pop(element[0])
             sub_topology.nodes[node_pair[1]][element[0]] = element[1]
-        sub_topology_list.append(sub_topology)
-        
-    return sub_topology_list
\ No newline at end of file
+        yield sub_topology